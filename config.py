@@ -16,13 +16,63 @@ ADMIN_ID = 1190237801
 SOURCE_CHANNEL_ID = -1002682552255      # Canal source Baccarat
 PREDICTION_CHANNEL_ID = -1003853896752  # Canal de prédiction
 
+# Destinations des prédictions (canaux/groupes), séparées par des virgules.
+# Par défaut: uniquement PREDICTION_CHANNEL_ID
+PREDICTION_CHANNEL_IDS = [
+    int(x) for x in os.getenv('PREDICTION_CHANNEL_IDS', str(PREDICTION_CHANNEL_ID)).split(',')
+    if x.strip()
+]
+
+# Attente maximale des envois/éditions avant de reprendre le traitement.
+# Les destinations lentes continuent en arrière-plan (jamais annulées).
+DESTINATION_TIMEOUT = float(os.getenv('DESTINATION_TIMEOUT', '10'))
+
+# Nombre maximum d'appels Telegram simultanés vers les destinations.
+# ~30 messages/s pour un bot: jusqu'à 30 destinations partent en une vague;
+# au-delà, chaque vague supplémentaire ajoute un aller-retour
+DESTINATION_CONCURRENCY = int(os.getenv('DESTINATION_CONCURRENCY', '30'))
+
 # Port pour Render.com (obligatoire)
 PORT = 10000
 
+# ==================== CACHE DE DÉMARRAGE ====================
+# Session Telegram et entités (access_hash) sauvegardées sur disque
+# pour éviter la ré-autorisation et les résolutions au redémarrage
+SESSION_FILE = os.getenv('SESSION_FILE', 'bot_session.txt')
+ENTITY_CACHE_FILE = os.getenv('ENTITY_CACHE_FILE', 'entity_cache.json')
+
 # ==================== CONFIGURATION PRÉDICTION ====================
 # Offset pour la prédiction (défaut: 2) - N + a
 PREDICTION_OFFSET = int(os.getenv('PREDICTION_OFFSET', '2'))
 
+# ==================== CONFIGURATION TRANSFERT ====================
+# Mode de transfert des messages finalisés à l'admin:
+#   'direct' → un message par jeu finalisé
+#   'digest' → un résumé groupé envoyé en arrière-plan
+TRANSFER_MODE = os.getenv('TRANSFER_MODE', 'direct')
+
+# Résumé envoyé toutes les N secondes ou dès que N jeux sont en attente
+TRANSFER_DIGEST_INTERVAL = int(os.getenv('TRANSFER_DIGEST_INTERVAL', '120'))
+TRANSFER_DIGEST_MAX = int(os.getenv('TRANSFER_DIGEST_MAX', '20'))
+
+# ==================== CONFIGURATION DIAGNOSTIC ====================
+# Jeton pour les endpoints HTTP protégés (désactivés si vide)
+ADMIN_HTTP_TOKEN = os.getenv('ADMIN_HTTP_TOKEN', '')
+
+# Durée maximale d'une session de profilage (secondes)
+PROFILE_MAX_SECONDS = int(os.getenv('PROFILE_MAX_SECONDS', '300'))
+
+# ==================== CONFIGURATION INGESTION HTTP ====================
+# Taille de la file de traitement de POST /ingest (au-delà: contre-pression)
+INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', '500'))
+
+# Nombre de messages récents mémorisés pour détecter les doublons
+# (fenêtre glissante: le plus ancien est oublié en premier)
+PROCESSED_MESSAGES_WINDOW = int(os.getenv('PROCESSED_MESSAGES_WINDOW', '20000'))
+
+# Taille maximale d'un élément JSON (octets)
+INGEST_MAX_ITEM_SIZE = int(os.getenv('INGEST_MAX_ITEM_SIZE', '65536'))
+
 # ==================== MAPPING DES COULEURS ====================
 SUIT_MAPPING = {
     '♠️': '❤️',
@@ -1,17 +1,28 @@
 import os
 import asyncio
 import re
+import json
+import time
+import codecs
 import logging
 import sys
+import hmac
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
 from datetime import datetime, timezone
-from telethon import TelegramClient, events
+from telethon import TelegramClient, events, errors, functions, types, utils
 from telethon.sessions import StringSession
 from aiohttp import web
 from config import (
     API_ID, API_HASH, BOT_TOKEN, ADMIN_ID,
-    SOURCE_CHANNEL_ID, PREDICTION_CHANNEL_ID, PORT,
+    SOURCE_CHANNEL_ID, PREDICTION_CHANNEL_IDS,
+    DESTINATION_TIMEOUT, DESTINATION_CONCURRENCY, PORT,
+    SESSION_FILE, ENTITY_CACHE_FILE,
     SUIT_MAPPING, ALL_SUITS, SUIT_DISPLAY, SUIT_NAMES,
-    PREDICTION_OFFSET
+    PREDICTION_OFFSET, TRANSFER_MODE, TRANSFER_DIGEST_INTERVAL, TRANSFER_DIGEST_MAX,
+    ADMIN_HTTP_TOKEN, PROFILE_MAX_SECONDS, INGEST_QUEUE_SIZE, INGEST_MAX_ITEM_SIZE,
+    PROCESSED_MESSAGES_WINDOW
 )
 
 # ==================== CONFIGURATION LOGGING ====================
@@ -36,20 +47,121 @@ if not BOT_TOKEN:
     exit(1)
 
 logger.info(f"🚀 Démarrage Bot Prédiction Baccarat v2.0")
-logger.info(f"📡 Configuration: SOURCE={SOURCE_CHANNEL_ID}, PREDICTION={PREDICTION_CHANNEL_ID}, PORT={PORT}")
+logger.info(f"📡 Configuration: SOURCE={SOURCE_CHANNEL_ID}, PREDICTION={PREDICTION_CHANNEL_IDS}, PORT={PORT}")
+
+# ==================== CACHE SESSION / ENTITÉS ====================
+# Les caches sont liés au compte du bot (préfixe numérique du token):
+# un changement de BOT_TOKEN les invalide.
+BOT_ID = int(BOT_TOKEN.split(':')[0])
+
+def _write_file_atomic(path: str, content: str):
+    """Écrit un fichier de façon atomique (pas de cache corrompu si arrêt brutal)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+
+def load_saved_session() -> str:
+    """Charge la session sauvegardée sur disque (vide si absente ou d'un autre bot)"""
+    try:
+        with open(SESSION_FILE, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return ''
+    except Exception as e:
+        logger.warning(f"⚠️ Session sur disque illisible: {e}")
+        return ''
+
+    if saved.get('bot_id') != BOT_ID:
+        logger.warning("⚠️ Session sur disque d'un autre bot, ignorée")
+        return ''
+    return saved.get('session', '')
+
+def save_session(session: str):
+    """Sauvegarde la session sur disque pour les redémarrages"""
+    try:
+        _write_file_atomic(SESSION_FILE, json.dumps({'bot_id': BOT_ID, 'session': session}))
+        logger.info(f"🔑 Session sauvegardée dans {SESSION_FILE}")
+    except Exception as e:
+        logger.error(f"❌ Erreur sauvegarde session: {e}")
+        logger.info("💡 Sauvegardez la session dans TELEGRAM_SESSION pour les redémarrages")
+
+def load_entity_cache() -> dict:
+    """Charge le cache des entités {peer_id: {access_hash, title, writable}} de ce bot"""
+    try:
+        with open(ENTITY_CACHE_FILE, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"⚠️ Cache entités illisible, ignoré: {e}")
+        return {}
+
+    # Les access_hash sont propres à chaque compte
+    if saved.get('bot_id') != BOT_ID:
+        logger.warning("⚠️ Cache entités d'un autre bot, ignoré")
+        return {}
+    return saved.get('entities', {})
+
+def save_entity_cache():
+    """Sauvegarde le cache des entités sur disque"""
+    try:
+        content = json.dumps({'bot_id': BOT_ID, 'entities': entity_cache}, ensure_ascii=False, indent=2)
+        _write_file_atomic(ENTITY_CACHE_FILE, content)
+    except Exception as e:
+        logger.error(f"❌ Erreur sauvegarde cache entités: {e}")
+
+def remember_entity(peer_id: int, entity, writable: bool = False):
+    """Enregistre l'access_hash d'une entité résolue"""
+    access_hash = getattr(entity, 'access_hash', None)
+    if access_hash is None:
+        return
+    entity_cache[str(peer_id)] = {
+        'access_hash': access_hash,
+        'title': getattr(entity, 'title', 'N/A'),
+        'writable': writable,
+        'saved_at': datetime.now().isoformat()
+    }
+    save_entity_cache()
+
+def forget_entity(peer_id: int):
+    """Invalide une entité du cache (périmée ou inaccessible)"""
+    if entity_cache.pop(str(peer_id), None) is not None:
+        save_entity_cache()
+        logger.info(f"🗑️ Entité {peer_id} retirée du cache")
 
 # ==================== INITIALISATION CLIENT ====================
-session_string = os.getenv('TELEGRAM_SESSION', '')
+session_string = os.getenv('TELEGRAM_SESSION', '') or load_saved_session()
 client = TelegramClient(StringSession(session_string), API_ID, API_HASH)
 
 # ==================== VARIABLES GLOBALES ====================
+entity_cache = load_entity_cache()  # Entités connues (access_hash) sur disque
+startup_seconds = None        # Durée du dernier démarrage (redémarrage → prêt)
 pending_predictions = {}      # Prédictions en attente
-processed_messages = set()    # Messages déjà traités
+processed_messages = OrderedDict()  # Messages déjà traités (fenêtre glissante, ordre d'arrivée)
 last_transferred_game = None  # Dernier jeu transféré
 current_game_number = 0       # Numéro de jeu actuel
 source_channel_ok = False     # Statut canal source
-prediction_channel_ok = False # Statut canal prédiction
+prediction_channel_ok = False # Statut canal prédiction (au moins une destination OK)
+prediction_destinations_ok = {}  # Statut par destination {chat_id: bool}
+destination_semaphore = asyncio.Semaphore(DESTINATION_CONCURRENCY)  # Limite anti-flood
+destination_tasks = set()     # Envois/éditions en arrière-plan (références fortes)
 transfer_enabled = True       # Transfert activé par défaut
+transfer_mode = TRANSFER_MODE if TRANSFER_MODE in ('direct', 'digest') else 'direct'
+DIGEST_MAX_INTERVAL = 3600    # Bornes de /digest on
+DIGEST_MAX_GAMES = 200
+digest_interval = min(TRANSFER_DIGEST_INTERVAL, DIGEST_MAX_INTERVAL)  # Intervalle du résumé (secondes)
+digest_max = min(TRANSFER_DIGEST_MAX, DIGEST_MAX_GAMES)               # Nombre de jeux avant envoi anticipé
+digest_games = []             # Jeux finalisés en attente de résumé
+digest_results = []           # Résultats de prédiction en attente de résumé
+digest_wakeup = None          # Événement de réveil de la tâche de résumé
+DIGEST_BACKLOG_MAX = 1000     # Taille max des tampons si les envois échouent
+digest_omitted = 0            # Éléments les plus anciens écartés du tampon
+digest_retry_at = 0.0         # Pas de nouvel envoi avant (après un échec)
+profiling_active = None       # Session de profilage en cours ('cpu', 'mem' ou None)
+ingest_queue = None           # File de traitement de POST /ingest
+ingest_task = None            # Tâche de traitement de la file d'ingestion
 
 # ==================== FONCTIONS UTILITAIRES ====================
 
@@ -136,36 +248,219 @@ def format_status_message(status_code: str) -> str:
         return "❌ PERDU"
     return status_code
 
+DIGEST_MESSAGE_LIMIT = 3800  # Marge sous la limite Telegram de 4096 caractères
+
+def format_digest_messages(games: list, results: list, omitted: int = 0) -> list:
+    """
+    Formate le résumé groupé (résultats d'abord, puis jeux finalisés),
+    découpé en plusieurs messages si nécessaire.
+    Retourne [(texte, jeux, résultats)] pour pouvoir remettre en file une partie non envoyée.
+    """
+    entries = [
+        ('result', item, f"• #{item[0]} {get_suit_display(item[1])} → {format_status_message(item[2])}")
+        for item in results
+    ] + [
+        ('game', item, f"• #{item[0]}: ({item[1]}) - ({item[2]})")
+        for item in games
+    ]
+
+    parts = []
+    current, size = [], 0
+    for entry in entries:
+        # Telegram compte en unités UTF-16 (un emoji = 2)
+        entry_size = len(entry[2].encode('utf-16-le')) // 2 + 1
+        if current and size + entry_size > DIGEST_MESSAGE_LIMIT:
+            parts.append(current)
+            current, size = [], 0
+        current.append(entry)
+        size += entry_size
+    if current:
+        parts.append(current)
+
+    messages = []
+    for index, part in enumerate(parts, 1):
+        part_results = [item for kind, item, _ in part if kind == 'result']
+        part_games = [item for kind, item, _ in part if kind == 'game']
+        header = f"📦 **Résumé transfert** ({len(games)} jeux finalisés, {len(results)} résultats)"
+        if len(parts) > 1:
+            header += f" [{index}/{len(parts)}]"
+
+        lines = [header]
+        if omitted and index == 1:
+            lines.append(f"⚠️ {omitted} éléments plus anciens omis (envois en échec)")
+        if part_results:
+            lines += ["", f"**🎯 Résultats ({len(part_results)}):**"]
+            lines += [text for kind, _, text in part if kind == 'result']
+        if part_games:
+            lines += ["", f"**🎮 Jeux ({len(part_games)}):**"]
+            lines += [text for kind, _, text in part if kind == 'game']
+
+        messages.append(("\n".join(lines), part_games, part_results))
+    return messages
+
 # ==================== FONCTIONS PRINCIPALES ====================
 
+# Erreurs indiquant que l'access_hash connu n'est plus valide
+STALE_ENTITY_ERRORS = (errors.ChannelInvalidError, errors.PeerIdInvalidError)
+
+# Erreurs indiquant que le bot n'a plus le droit d'écrire (hash toujours valide)
+ACCESS_LOST_ERRORS = (errors.ChatWriteForbiddenError, errors.ChannelPrivateError)
+
+def is_stale_entity_error(error: Exception) -> bool:
+    """Vrai si l'erreur signifie que l'entité doit être résolue à nouveau"""
+    if isinstance(error, STALE_ENTITY_ERRORS):
+        return True
+    return isinstance(error, ValueError) and 'Could not find the input entity' in str(error)
+
+def get_input_peer(peer_id: int):
+    """Pair d'entrée depuis le cache disque (aucun appel réseau), sinon l'ID brut"""
+    cached = entity_cache.get(str(peer_id))
+    if cached:
+        real_id, peer_type = utils.resolve_id(peer_id)
+        if peer_type is types.PeerChannel:
+            return types.InputPeerChannel(real_id, cached['access_hash'])
+    return peer_id
+
+async def resolve_entity(peer_id: int):
+    """
+    Résout une entité via Telegram sans passer par le cache de session.
+    Canaux: GetChannelsRequest avec access_hash=0 (autorisé pour les bots).
+    """
+    real_id, peer_type = utils.resolve_id(peer_id)
+    if peer_type is not types.PeerChannel:
+        return await client.get_entity(peer_id)
+
+    result = await client(functions.channels.GetChannelsRequest([types.InputChannel(real_id, 0)]))
+    client.session.process_entities(result)
+    return result.chats[0]
+
+async def with_entity_refresh(peer_id: int, action):
+    """
+    Exécute action(peer). Si l'entité connue est périmée, l'invalide,
+    la résout à nouveau via Telegram et réessaie une fois avec le nouveau hash.
+    """
+    try:
+        return await action(get_input_peer(peer_id))
+    except Exception as e:
+        if not is_stale_entity_error(e):
+            raise
+        cached = entity_cache.get(str(peer_id), {})
+        logger.warning(f"⚠️ Entité {peer_id} périmée: {e}")
+        forget_entity(peer_id)
+        entity = await resolve_entity(peer_id)
+        result = await action(utils.get_input_peer(entity))
+        remember_entity(peer_id, entity, writable=cached.get('writable', False))
+        return result
+
+def get_active_destinations() -> list:
+    """Destinations de prédiction accessibles en écriture"""
+    return [d for d in PREDICTION_CHANNEL_IDS if prediction_destinations_ok.get(d)]
+
+def spawn_destination_task(coro) -> asyncio.Task:
+    """Lance un envoi/une édition en arrière-plan (jamais annulé par un délai)"""
+    task = asyncio.create_task(coro)
+    destination_tasks.add(task)
+    task.add_done_callback(destination_tasks.discard)
+    return task
+
+async def run_on_destination(destination: int, action, label: str):
+    """
+    Exécute une action Telegram sur une destination, au plus DESTINATION_CONCURRENCY
+    à la fois. Les erreurs sont isolées: une destination en échec ne bloque pas les
+    autres. Pas de délai d'annulation: l'attente FloodWait de Telethon va à son terme.
+    """
+    global prediction_channel_ok
+
+    try:
+        async with destination_semaphore:
+            return await with_entity_refresh(destination, action)
+    except ACCESS_LOST_ERRORS as e:
+        # Plus le droit d'écrire: destination désactivée jusqu'à /checkchannels
+        prediction_destinations_ok[destination] = False
+        prediction_channel_ok = bool(get_active_destinations())
+        if str(destination) in entity_cache:
+            entity_cache[str(destination)]['writable'] = False
+            save_entity_cache()
+        logger.error(f"⛔ {label} {destination}: accès perdu ({e})")
+    except Exception as e:
+        logger.error(f"❌ {label} {destination}: {e}")
+    return None
+
+async def check_prediction_destination(destination: int, use_cache: bool = True, test_text: str = "🔍 Test..."):
+    """Vérifie l'accès en écriture à une destination. Retourne (ok, titre ou erreur)"""
+    cached = entity_cache.get(str(destination))
+    if use_cache and cached and cached.get('writable'):
+        prediction_destinations_ok[destination] = True
+        return True, f"{cached.get('title', 'N/A')} (cache)"
+
+    try:
+        entity = await resolve_entity(destination)
+    except Exception as e:
+        prediction_destinations_ok[destination] = False
+        forget_entity(destination)
+        return False, str(e)[:50]
+
+    # Test d'écriture
+    try:
+        peer = utils.get_input_peer(entity)
+        test = await client.send_message(peer, test_text)
+        await client.delete_messages(peer, test.id)
+    except Exception:
+        prediction_destinations_ok[destination] = False
+        forget_entity(destination)
+        return False, "Lecture seule"
+
+    prediction_destinations_ok[destination] = True
+    remember_entity(destination, entity, writable=True)
+    return True, getattr(entity, 'title', 'N/A')
+
+async def check_all_prediction_destinations(use_cache: bool = True, test_text: str = "🔍 Test..."):
+    """Vérifie toutes les destinations en parallèle. Retourne [(destination, ok, détail)]"""
+    global prediction_channel_ok
+
+    results = await asyncio.gather(*(
+        check_prediction_destination(d, use_cache, test_text) for d in PREDICTION_CHANNEL_IDS
+    ))
+    prediction_channel_ok = any(ok for ok, _ in results)
+    return [(d, ok, detail) for d, (ok, detail) in zip(PREDICTION_CHANNEL_IDS, results)]
+
 async def send_prediction_to_channel(target_game: int, suit: str, base_game: int):
-    """Envoie une prédiction au canal de prédiction"""
+    """Envoie une prédiction à toutes les destinations (en parallèle)"""
     try:
         prediction_msg = format_prediction_message(target_game, suit, "⏳⏳")
-        msg_id = 0
 
-        if PREDICTION_CHANNEL_ID and prediction_channel_ok:
-            try:
-                pred_msg = await client.send_message(PREDICTION_CHANNEL_ID, prediction_msg)
-                msg_id = pred_msg.id
-                logger.info(f"✅ Prédiction envoyée: Jeu #{target_game} - {get_suit_display(suit)} {get_suit_name(suit)}")
-            except Exception as e:
-                logger.error(f"❌ Erreur envoi prédiction: {e}")
-        else:
-            logger.warning(f"⚠️ Canal prédiction non accessible")
-
-        # Stocker la prédiction
-        pending_predictions[target_game] = {
-            'message_id': msg_id,
+        # Stocker la prédiction avant l'envoi: chaque destination
+        # enregistre son message_id dès qu'elle répond
+        pred = {
+            'message_ids': {},
             'suit': suit,
             'base_game': base_game,
             'status': '⏳⏳',
             'check_count': 0,
             'created_at': datetime.now().isoformat()
         }
+        pending_predictions[target_game] = pred
+
+        async def send_to(destination):
+            sent = await run_on_destination(
+                destination,
+                lambda peer: client.send_message(peer, prediction_msg),
+                "Erreur envoi prédiction"
+            )
+            if sent:
+                pred['message_ids'][destination] = sent.id
+
+        destinations = get_active_destinations()
+        if destinations:
+            # Les envois sont gardés sur la prédiction: la vérification les attend
+            pred['send_tasks'] = [spawn_destination_task(send_to(d)) for d in destinations]
+            _, still_sending = await asyncio.wait(pred['send_tasks'], timeout=DESTINATION_TIMEOUT)
+            logger.info(f"✅ Prédiction envoyée: Jeu #{target_game} - {get_suit_display(suit)} {get_suit_name(suit)} ({len(pred['message_ids'])}/{len(destinations)} destinations, {len(still_sending)} en cours)")
+        else:
+            logger.warning(f"⚠️ Aucune destination de prédiction accessible")
 
         logger.info(f"🎯 Prédiction active: #{target_game} - {get_suit_display(suit)} (basé sur #{base_game})")
-        return msg_id
+        return pred['message_ids']
 
     except Exception as e:
         logger.error(f"❌ Erreur création prédiction: {e}")
@@ -178,24 +473,42 @@ async def update_prediction_status(game_number: int, new_status: str):
             return False
 
         pred = pending_predictions[game_number]
-        message_id = pred['message_id']
         suit = pred['suit']
 
         status_text = format_status_message(new_status)
         updated_msg = format_prediction_message(game_number, suit, status_text)
 
-        # Mettre à jour le message dans le canal
-        if PREDICTION_CHANNEL_ID and message_id > 0 and prediction_channel_ok:
-            try:
-                await client.edit_message(PREDICTION_CHANNEL_ID, message_id, updated_msg)
-                logger.info(f"✅ Statut mis à jour: #{game_number} → {status_text}")
-            except Exception as e:
-                logger.error(f"❌ Erreur mise à jour message: {e}")
+        async def edit_all_destinations():
+            # Attendre les envois encore en cours pour éditer tous les messages
+            send_tasks = pred.get('send_tasks', [])
+            if send_tasks:
+                await asyncio.gather(*send_tasks)
+
+            message_ids = pred['message_ids']
+            if not message_ids:
+                return
+            results = await asyncio.gather(*(
+                run_on_destination(
+                    destination,
+                    lambda peer, message_id=message_id:
+                        client.edit_message(peer, message_id, updated_msg),
+                    "Erreur mise à jour message"
+                )
+                for destination, message_id in message_ids.items()
+            ))
+            updated = sum(1 for r in results if r is not None)
+            logger.info(f"✅ Statut mis à jour: #{game_number} → {status_text} ({updated}/{len(message_ids)} destinations)")
+
+        # Mettre à jour le message dans chaque destination (en parallèle);
+        # les destinations lentes terminent en arrière-plan
+        await asyncio.wait([spawn_destination_task(edit_all_destinations())], timeout=DESTINATION_TIMEOUT)
 
         pred['status'] = new_status
 
         # Supprimer si terminé
         if new_status in ['✅0️⃣', '✅1️⃣', '✅2️⃣', '❌']:
+            if transfer_enabled and transfer_mode == 'digest':
+                digest_results.append((game_number, suit, new_status))
             del pending_predictions[game_number]
             logger.info(f"🗑️ Prédiction #{game_number} terminée et supprimée")
 
@@ -261,29 +574,30 @@ async def process_new_message(message_text: str, chat_id: int, is_finalized: boo
     Traite un message du canal source.
     is_finalized=False → Création de prédiction (immédiat)
     is_finalized=True → Vérification des prédictions
+    Retourne 'accepted', 'duplicate', 'invalid' ou 'error'.
     """
     global last_transferred_game, current_game_number
 
     try:
         game_number = extract_game_number(message_text)
         if game_number is None:
-            return
+            return 'invalid'
 
         current_game_number = game_number
 
         # Éviter les doublons
         message_hash = f"{game_number}_{message_text[:50]}"
         if message_hash in processed_messages:
-            return
-        processed_messages.add(message_hash)
-        if len(processed_messages) > 200:
-            processed_messages.clear()
+            return 'duplicate'
+        processed_messages[message_hash] = None
+        if len(processed_messages) > PROCESSED_MESSAGES_WINDOW:
+            processed_messages.popitem(last=False)
 
         # Extraire les groupes
         groups = extract_parentheses_groups(message_text)
         if len(groups) < 2:
             logger.warning(f"⚠️ Jeu #{game_number}: moins de 2 groupes trouvés")
-            return
+            return 'invalid'
 
         first_group = groups[0]
         second_group = groups[1]
@@ -296,16 +610,24 @@ async def process_new_message(message_text: str, chat_id: int, is_finalized: boo
 
             # Transfert à l'admin si activé
             if transfer_enabled and ADMIN_ID and last_transferred_game != game_number:
-                try:
-                    transfer_msg = f"📨 **Message finalisé:**\n\n{message_text}"
-                    await client.send_message(ADMIN_ID, transfer_msg)
+                if transfer_mode == 'digest':
+                    # Mis en file: envoyé par transfer_digest_loop()
+                    digest_games.append((game_number, first_group, second_group))
                     last_transferred_game = game_number
-                except Exception as e:
-                    logger.error(f"❌ Erreur transfert: {e}")
+                    # Pas de réveil anticipé pendant l'attente après un échec
+                    if len(digest_games) >= digest_max and digest_wakeup and time.monotonic() >= digest_retry_at:
+                        digest_wakeup.set()
+                else:
+                    try:
+                        transfer_msg = f"📨 **Message finalisé:**\n\n{message_text}"
+                        await client.send_message(ADMIN_ID, transfer_msg)
+                        last_transferred_game = game_number
+                    except Exception as e:
+                        logger.error(f"❌ Erreur transfert: {e}")
 
             # Vérifier les résultats
             await check_prediction_result(game_number, first_group, second_group)
-            return
+            return 'accepted'
 
         # === MODE NOUVEAU MESSAGE : Création prédiction ===
         # Nouvelle règle: 2 cartes identiques dans le 2ème groupe
@@ -323,10 +645,221 @@ async def process_new_message(message_text: str, chat_id: int, is_finalized: boo
         else:
             logger.info(f"ℹ️ Jeu #{game_number}: pas de doublon dans G2, pas de prédiction")
 
+        return 'accepted'
+
     except Exception as e:
         logger.error(f"❌ Erreur traitement message: {e}")
         import traceback
         logger.error(traceback.format_exc())
+        return 'error'
+
+# ==================== RÉSUMÉ DE TRANSFERT ====================
+
+def trim_digest_backlog():
+    """Borne les tampons: écarte les plus anciens, seul leur nombre est conservé"""
+    global digest_games, digest_results, digest_omitted
+
+    if len(digest_games) > DIGEST_BACKLOG_MAX:
+        digest_omitted += len(digest_games) - DIGEST_BACKLOG_MAX
+        digest_games = digest_games[-DIGEST_BACKLOG_MAX:]
+    if len(digest_results) > DIGEST_BACKLOG_MAX:
+        digest_omitted += len(digest_results) - DIGEST_BACKLOG_MAX
+        digest_results = digest_results[-DIGEST_BACKLOG_MAX:]
+
+def requeue_digest(games: list, results: list):
+    """Remet en tête de file des éléments non envoyés"""
+    global digest_games, digest_results
+
+    digest_games = games + digest_games
+    digest_results = results + digest_results
+    trim_digest_backlog()
+
+async def flush_transfer_digest(force: bool = False):
+    """Envoie à l'admin le résumé des jeux finalisés en attente"""
+    global digest_games, digest_results, digest_omitted, digest_retry_at
+
+    if not digest_games and not digest_results:
+        return
+
+    # Après un échec: attendre l'intervalle suivant (ou la fin du FloodWait)
+    if not force and time.monotonic() < digest_retry_at:
+        return
+
+    # Vider les tampons avant l'envoi (nouveaux jeux → prochain résumé)
+    games, results = digest_games, digest_results
+    digest_games, digest_results = [], []
+
+    if not transfer_enabled or not ADMIN_ID:
+        return
+
+    omitted, digest_omitted = digest_omitted, 0
+    messages = format_digest_messages(games, results, omitted)
+    for index, (text, part_games, part_results) in enumerate(messages):
+        try:
+            await client.send_message(ADMIN_ID, text)
+        except Exception as e:
+            # Remettre en file les parties non envoyées (prochain résumé)
+            unsent = messages[index:]
+            if index == 0:
+                digest_omitted += omitted
+            requeue_digest(
+                [g for _, pg, _ in unsent for g in pg],
+                [r for _, _, pr in unsent for r in pr]
+            )
+            wait = max(digest_interval, getattr(e, 'seconds', 0) or 0)
+            digest_retry_at = time.monotonic() + wait
+            logger.error(f"❌ Erreur envoi résumé ({len(digest_games)} jeux remis en file, nouvel essai dans {wait}s): {e}")
+            return
+
+    digest_retry_at = 0.0
+
+    logger.info(f"📦 Résumé transféré: {len(games)} jeux, {len(results)} résultats ({len(messages)} messages)")
+
+async def transfer_digest_loop():
+    """Tâche de fond: envoie le résumé à intervalle régulier ou quand le tampon est plein"""
+    while True:
+        try:
+            await asyncio.wait_for(digest_wakeup.wait(), timeout=digest_interval)
+        except asyncio.TimeoutError:
+            pass
+        digest_wakeup.clear()
+        trim_digest_backlog()
+
+        if transfer_mode == 'digest':
+            await flush_transfer_digest()
+
+# ==================== PROFILAGE ====================
+# Aucun coût quand inactif: le thread d'échantillonnage et tracemalloc
+# ne tournent que pendant la fenêtre demandée.
+
+PROFILE_SAMPLE_INTERVAL = 0.005  # 5 ms entre deux échantillons
+PROFILE_TOP = 15
+
+def _is_idle_frame(frame) -> bool:
+    """Vrai si la boucle asyncio attend des événements (selectors.select)"""
+    return os.path.basename(frame.f_code.co_filename) == 'selectors.py'
+
+def _sample_loop_thread(thread_id: int, stop: threading.Event, self_counts: Counter,
+                        total_counts: Counter, idle: Counter):
+    """Échantillonne la pile du thread de la boucle asyncio jusqu'à l'arrêt"""
+    while not stop.wait(PROFILE_SAMPLE_INTERVAL):
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:
+            continue
+
+        # Boucle inactive: comptée à part pour ne pas masquer le travail réel
+        if _is_idle_frame(frame):
+            idle['samples'] += 1
+            continue
+
+        code = frame.f_code
+        self_counts[(code.co_filename, frame.f_lineno, code.co_name)] += 1
+
+        seen = set()
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_filename, code.co_firstlineno, code.co_name)
+            if key not in seen:
+                seen.add(key)
+                total_counts[key] += 1
+            frame = frame.f_back
+
+def _format_location(filename: str, lineno: int, name: str) -> str:
+    """Formate un emplacement de code de façon compacte"""
+    return f"{os.path.basename(filename)}:{lineno} {name}"
+
+async def run_cpu_profile(seconds: int) -> str:
+    """Profilage CPU par échantillonnage pendant `seconds` secondes"""
+    self_counts = Counter()
+    total_counts = Counter()
+    idle = Counter()
+    stop = threading.Event()
+    sampler = threading.Thread(
+        target=_sample_loop_thread,
+        args=(threading.get_ident(), stop, self_counts, total_counts, idle),
+        daemon=True
+    )
+
+    sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stop.set()
+        await asyncio.to_thread(sampler.join)
+
+    samples = sum(self_counts.values())
+    all_samples = samples + idle['samples']
+    if samples == 0:
+        return f"🔬 Profil CPU ({seconds}s): aucun échantillon actif ({all_samples} inactifs)"
+
+    # Pourcentages calculés sur les échantillons actifs uniquement
+    lines = [
+        f"🔬 Profil CPU ({seconds}s, {samples} échantillons actifs)",
+        f"Inactif (attente événements): {100 * idle['samples'] / all_samples:.1f}%",
+        "",
+        "Temps propre:"
+    ]
+    for (filename, lineno, name), count in self_counts.most_common(PROFILE_TOP):
+        lines.append(f"{100 * count / samples:5.1f}%  {_format_location(filename, lineno, name)}")
+
+    lines.append("")
+    lines.append("Temps cumulé:")
+    for (filename, lineno, name), count in total_counts.most_common(PROFILE_TOP):
+        lines.append(f"{100 * count / samples:5.1f}%  {_format_location(filename, lineno, name)}")
+
+    return "\n".join(lines)
+
+async def run_memory_trace(seconds: int) -> str:
+    """Trace des allocations (tracemalloc) pendant `seconds` secondes"""
+    if tracemalloc.is_tracing():
+        return "⚠️ tracemalloc déjà actif"
+
+    def compare_snapshots(start_snapshot):
+        end_snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        return end_snapshot.compare_to(start_snapshot, 'lineno'), current, peak
+
+    tracemalloc.start()
+    try:
+        start_snapshot = tracemalloc.take_snapshot()
+        await asyncio.sleep(seconds)
+        # Snapshot final et comparaison hors de la boucle asyncio
+        stats, current, peak = await asyncio.to_thread(compare_snapshots, start_snapshot)
+    finally:
+        tracemalloc.stop()
+
+    lines = [
+        f"🧠 Allocations ({seconds}s)",
+        f"Actuel: {current / 1024:.1f} Ko | Pic: {peak / 1024:.1f} Ko",
+        "",
+        "Sites d'allocation (Δ taille, Δ blocs):"
+    ]
+    for stat in stats[:PROFILE_TOP]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size_diff / 1024:+8.1f} Ko {stat.count_diff:+6d}  "
+            f"{_format_location(frame.filename, frame.lineno, '')}".rstrip()
+        )
+
+    return "\n".join(lines)
+
+async def run_profiling(kind: str, seconds: int) -> str:
+    """Lance une session de profilage bornée (une seule à la fois)"""
+    global profiling_active
+
+    if profiling_active:
+        return f"⚠️ Profilage déjà en cours ({profiling_active})"
+
+    seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+    profiling_active = kind
+    logger.info(f"🔬 Profilage {kind} démarré pour {seconds}s")
+    try:
+        if kind == 'cpu':
+            return await run_cpu_profile(seconds)
+        return await run_memory_trace(seconds)
+    finally:
+        profiling_active = None
+        logger.info(f"🔬 Profilage {kind} terminé")
 
 # ==================== HANDLERS TÉLÉGRAM ====================
 
@@ -390,6 +923,9 @@ async def cmd_start(event):
 • `/setoffset <n>` - Changer l'offset (admin)
 • `/transfert` - Activer le transfert
 • `/stoptransfert` - Désactiver le transfert
+• `/digest` - Mode résumé du transfert (admin)
+• `/profile <s>` - Profil CPU (admin)
+• `/memtrace <s>` - Trace mémoire (admin)
 • `/checkchannels` - Vérifier les canaux
 • `/debug` - Informations système
 • `/help` - Aide complète""")
@@ -457,15 +993,17 @@ async def cmd_debug(event):
 
 **Config:**
 • Source: {SOURCE_CHANNEL_ID}
-• Prédiction: {PREDICTION_CHANNEL_ID}
+• Prédiction: {', '.join(str(d) for d in PREDICTION_CHANNEL_IDS)}
 • Admin: {ADMIN_ID}
 • Offset: {PREDICTION_OFFSET}
+• Transfert: {'✅' if transfer_enabled else '⛔'} ({transfer_mode})
 
 **Statut:**
 • Source OK: {'✅' if source_channel_ok else '❌'}
-• Prédiction OK: {'✅' if prediction_channel_ok else '❌'}
+• Prédiction OK: {len(get_active_destinations())}/{len(PREDICTION_CHANNEL_IDS)}
 • Jeu actuel: #{current_game_number}
 • Prédictions: {len(pending_predictions)}
+• Démarrage: {f'{startup_seconds:.2f}s' if startup_seconds is not None else 'N/A'}
 
 **Version:** 2.0 (Render.com)
 """
@@ -473,7 +1011,7 @@ async def cmd_debug(event):
 
 @client.on(events.NewMessage(pattern='/checkchannels'))
 async def cmd_checkchannels(event):
-    global source_channel_ok, prediction_channel_ok
+    global source_channel_ok
 
     if event.is_group or event.is_channel:
         return
@@ -483,25 +1021,21 @@ async def cmd_checkchannels(event):
 
     # Vérifier canal source
     try:
-        source_entity = await client.get_entity(SOURCE_CHANNEL_ID)
+        source_entity = await resolve_entity(SOURCE_CHANNEL_ID)
         source_channel_ok = True
+        remember_entity(SOURCE_CHANNEL_ID, source_entity)
         result_msg += f"✅ **Source:** {getattr(source_entity, 'title', 'N/A')}\n"
     except Exception as e:
         source_channel_ok = False
+        forget_entity(SOURCE_CHANNEL_ID)
         result_msg += f"❌ **Source:** {str(e)[:50]}\n"
 
-    # Vérifier canal prédiction
-    try:
-        pred_entity = await client.get_entity(PREDICTION_CHANNEL_ID)
-        try:
-            test_msg = await client.send_message(PREDICTION_CHANNEL_ID, "🔍 Test...")
-            await client.delete_messages(PREDICTION_CHANNEL_ID, test_msg.id)
-            prediction_channel_ok = True
-            result_msg += f"✅ **Prédiction:** {getattr(pred_entity, 'title', 'N/A')}\n"
-        except:
-            result_msg += f"⚠️ **Prédiction:** Lecture seule\n"
-    except Exception as e:
-        result_msg += f"❌ **Prédiction:** {str(e)[:50]}\n"
+    # Vérifier les destinations de prédiction (sans le cache)
+    for destination, ok, detail in await check_all_prediction_destinations(use_cache=False):
+        if ok:
+            result_msg += f"✅ **Prédiction** `{destination}`: {detail}\n"
+        else:
+            result_msg += f"❌ **Prédiction** `{destination}`: {detail}\n"
 
     await event.respond(result_msg)
 
@@ -521,6 +1055,88 @@ async def cmd_stop_transfert(event):
     transfer_enabled = False
     await event.respond("⛔ Transfert désactivé")
 
+@client.on(events.NewMessage(pattern='/digest'))
+async def cmd_digest(event):
+    global transfer_mode, digest_interval, digest_max
+
+    if event.is_group or event.is_channel:
+        return
+
+    if event.sender_id != ADMIN_ID:
+        await event.respond("⛔ Réservé à l'admin")
+        return
+
+    try:
+        parts = event.message.message.split()
+
+        if len(parts) < 2:
+            await event.respond(f"""📦 **Mode transfert:** {transfer_mode}
+⏱️ Intervalle: {digest_interval}s
+🔢 Max jeux: {digest_max}
+📥 En attente: {len(digest_games)} jeux, {len(digest_results)} résultats
+
+**Usage:**
+• `/digest on [secondes] [max]` - Résumé groupé
+• `/digest off` - Un message par jeu""")
+            return
+
+        if parts[1] == 'off':
+            transfer_mode = 'direct'
+            await flush_transfer_digest(force=True)
+            await event.respond("✅ Mode transfert: un message par jeu")
+        elif parts[1] == 'on':
+            new_interval = int(parts[2]) if len(parts) > 2 else digest_interval
+            new_max = int(parts[3]) if len(parts) > 3 else digest_max
+            if not 10 <= new_interval <= DIGEST_MAX_INTERVAL or not 1 <= new_max <= DIGEST_MAX_GAMES:
+                await event.respond(f"❌ Intervalle entre 10 et {DIGEST_MAX_INTERVAL}s, max jeux entre 1 et {DIGEST_MAX_GAMES}")
+                return
+            digest_interval = new_interval
+            digest_max = new_max
+            transfer_mode = 'digest'
+            if digest_wakeup:
+                digest_wakeup.set()
+            await event.respond(f"✅ Mode transfert: résumé toutes les {digest_interval}s ou {digest_max} jeux")
+        else:
+            await event.respond("❌ Usage: `/digest on [secondes] [max]` ou `/digest off`")
+            return
+
+        logger.info(f"📦 Mode transfert modifié par admin: {transfer_mode}")
+
+    except ValueError:
+        await event.respond("❌ Nombre invalide")
+    except Exception as e:
+        await event.respond(f"❌ Erreur: {str(e)}")
+
+async def _profiling_command(event, kind: str, default_seconds: int):
+    """Commun à /profile et /memtrace"""
+    if event.is_group or event.is_channel:
+        return
+
+    if event.sender_id != ADMIN_ID:
+        await event.respond("⛔ Réservé à l'admin")
+        return
+
+    try:
+        parts = event.message.message.split()
+        seconds = int(parts[1]) if len(parts) > 1 else default_seconds
+    except ValueError:
+        await event.respond("❌ Nombre invalide")
+        return
+
+    await event.respond(f"🔬 Profilage {kind} lancé ({min(max(1, seconds), PROFILE_MAX_SECONDS)}s)...")
+    report = await run_profiling(kind, seconds)
+    if len(report) > 3900:
+        report = report[:3900] + "\n…"
+    await event.respond(f"```\n{report}\n```")
+
+@client.on(events.NewMessage(pattern='/profile'))
+async def cmd_profile(event):
+    await _profiling_command(event, 'cpu', 30)
+
+@client.on(events.NewMessage(pattern='/memtrace'))
+async def cmd_memtrace(event):
+    await _profiling_command(event, 'mem', 60)
+
 @client.on(events.NewMessage(pattern='/help'))
 async def cmd_help(event):
     if event.is_group or event.is_channel:
@@ -550,6 +1166,9 @@ Quand le **2ème groupe** contient **2 cartes de même couleur**:
 • `/setoffset <n>` - Changer offset (admin)
 • `/transfert` - Activer transfert
 • `/stoptransfert` - Désactiver
+• `/digest on|off` - Transfert groupé (admin)
+• `/profile <s>` - Profil CPU sur s secondes (admin)
+• `/memtrace <s>` - Allocations sur s secondes (admin)
 • `/checkchannels` - Vérifier canaux
 • `/debug` - Infos système""")
 
@@ -601,15 +1220,198 @@ async def status_api(request):
         "prediction_offset": PREDICTION_OFFSET,
         "source_channel_ok": source_channel_ok,
         "prediction_channel_ok": prediction_channel_ok,
+        "prediction_destinations": {str(d): prediction_destinations_ok.get(d, False) for d in PREDICTION_CHANNEL_IDS},
+        "startup_seconds": startup_seconds,
         "timestamp": datetime.now().isoformat()
     })
 
+def is_authorized_request(request) -> bool:
+    """
+    Vérifie le jeton admin (en-tête Authorization: Bearer uniquement:
+    la query string apparaît dans les logs d'accès)
+    """
+    if not ADMIN_HTTP_TOKEN:
+        return False
+    auth = request.headers.get('Authorization', '')
+    if not auth.startswith('Bearer '):
+        return False
+    return hmac.compare_digest(auth[7:].encode(), ADMIN_HTTP_TOKEN.encode())
+
+async def _profiling_api(request, kind: str, default_seconds: int):
+    """Commun aux endpoints de profilage"""
+    if not is_authorized_request(request):
+        return web.Response(text="Forbidden", status=403)
+
+    try:
+        seconds = int(request.query.get('seconds', default_seconds))
+    except ValueError:
+        return web.Response(text="Invalid seconds", status=400)
+
+    report = await run_profiling(kind, seconds)
+    return web.Response(text=report, content_type='text/plain', status=200)
+
+async def profile_api(request):
+    """Profil CPU à la demande (protégé)"""
+    return await _profiling_api(request, 'cpu', 30)
+
+async def memtrace_api(request):
+    """Trace mémoire à la demande (protégée)"""
+    return await _profiling_api(request, 'mem', 60)
+
+# ==================== INGESTION HTTP ====================
+
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+async def ingest_worker():
+    """Traite la file d'ingestion dans l'ordre, par le même chemin que Telegram"""
+    while True:
+        message_text, is_finalized, future = await ingest_queue.get()
+        try:
+            result = await process_new_message(message_text, SOURCE_CHANNEL_ID, is_finalized=is_finalized)
+            if not future.done():
+                future.set_result(result)
+        finally:
+            ingest_queue.task_done()
+
+async def iter_ndjson_items(stream):
+    """Lit un corps NDJSON ligne par ligne (sans tout charger en mémoire)"""
+    async for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield None  # Ligne invalide: comptée, le lot continue
+
+async def iter_json_array_items(stream):
+    """Lit un tableau JSON élément par élément, au fil des morceaux reçus"""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    state = 'start'  # start → item → separator → ... → end
+    eof = False
+
+    while state != 'end':
+        chunk = await stream.readany()
+        eof = not chunk
+        buffer += utf8.decode(chunk, final=eof)
+
+        while True:
+            buffer = buffer.lstrip()
+            if not buffer:
+                break
+
+            if state == 'start':
+                if buffer[0] != '[':
+                    raise ValueError("Tableau JSON attendu")
+                buffer = buffer[1:]
+                state = 'first_item'
+            elif state == 'separator':
+                if buffer[0] == ',':
+                    buffer = buffer[1:]
+                    state = 'item'
+                elif buffer[0] == ']':
+                    buffer = buffer[1:]
+                    state = 'end'
+                    break
+                else:
+                    raise ValueError("',' ou ']' attendu")
+            else:
+                if state == 'first_item' and buffer[0] == ']':
+                    buffer = buffer[1:]
+                    state = 'end'
+                    break
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    if eof or len(buffer) > INGEST_MAX_ITEM_SIZE:
+                        raise
+                    break  # Élément incomplet: attendre la suite
+                if end == len(buffer) and not eof:
+                    break  # Peut-être tronqué (nombre): attendre la suite
+                buffer = buffer[end:]
+                state = 'separator'
+                yield item
+
+        if eof and state != 'end':
+            raise ValueError("Tableau JSON incomplet")
+
+    if buffer.strip() or (await stream.read()).strip():
+        raise ValueError("Données après la fin du tableau JSON")
+
+def parse_ingest_item(item):
+    """Convertit un élément reçu en (texte, finalisé). None si invalide."""
+    if isinstance(item, str):
+        return item, is_message_finalized(item)
+    if isinstance(item, dict) and isinstance(item.get('text'), str):
+        text = item['text']
+        finalized = item.get('finalized', is_message_finalized(text))
+        if not isinstance(finalized, bool):
+            return None
+        return text, finalized
+    return None
+
+async def ingest_api(request):
+    """
+    POST /ingest: lots de lignes de jeu brutes (JSON ou NDJSON).
+    Éléments: "texte" ou {"text": "...", "finalized": bool}.
+    Corps lu au fil de l'eau; la file bornée applique la contre-pression.
+    Les compteurs font foi: en cas d'erreur de format en cours de lot (207),
+    les éléments déjà comptés ont été traités et ne doivent pas être renvoyés.
+    """
+    if not is_authorized_request(request):
+        return web.Response(text="Forbidden", status=403)
+    # File créée une fois le bot démarré; refus pendant une reconnexion
+    if ingest_queue is None or not client.is_connected():
+        return web.Response(text="Bot not ready", status=503, headers={'Retry-After': '5'})
+
+    if request.content_type in NDJSON_CONTENT_TYPES:
+        items = iter_ndjson_items(request.content)
+    elif request.content_type == 'application/json':
+        items = iter_json_array_items(request.content)
+    else:
+        return web.Response(text="Unsupported content type", status=415)
+
+    loop = asyncio.get_running_loop()
+    futures = []
+    counts = {'accepted': 0, 'duplicate': 0, 'invalid': 0, 'error': 0}
+    parse_error = None
+
+    try:
+        async for item in items:
+            parsed = parse_ingest_item(item)
+            if parsed is None:
+                counts['invalid'] += 1
+                continue
+            future = loop.create_future()
+            # Bloque si la file est pleine: la lecture du corps est suspendue
+            await ingest_queue.put((parsed[0], parsed[1], future))
+            futures.append(future)
+    except ValueError as e:
+        parse_error = str(e)[:200]
+
+    for result in await asyncio.gather(*futures):
+        counts[result] += 1
+
+    total = sum(counts.values())
+    logger.info(f"📥 Ingestion: {total} éléments, {counts['accepted']} acceptés, {counts['duplicate']} doublons")
+
+    response = dict(counts, total=total)
+    if parse_error:
+        response['parse_error'] = parse_error
+        return web.json_response(response, status=207)
+    return web.json_response(response)
+
 async def start_web_server():
     """Démarre le serveur web sur le port 10000"""
     app = web.Application()
     app.router.add_get('/', index)
     app.router.add_get('/health', health_check)
     app.router.add_get('/status', status_api)
+    app.router.add_get('/debug/profile', profile_api)
+    app.router.add_get('/debug/memtrace', memtrace_api)
+    app.router.add_post('/ingest', ingest_api)
 
     runner = web.AppRunner(app)
     await runner.setup()
@@ -621,40 +1423,56 @@ async def start_web_server():
 
 async def start_bot():
     """Démarre le bot Telegram"""
-    global source_channel_ok, prediction_channel_ok
+    global source_channel_ok, startup_seconds
 
+    started_at = time.perf_counter()
     try:
         logger.info("🔌 Connexion à Telegram...")
+        had_session = bool(session_string)
         await client.start(bot_token=BOT_TOKEN)
 
         me = await client.get_me()
         logger.info(f"🤖 Bot connecté: @{me.username}")
 
-        # Sauvegarder la session
+        # start() ne fait qu'avertir si la session appartient à un autre bot
+        if me.id != BOT_ID:
+            logger.error(f"❌ La session appartient à un autre bot (@{me.username}): videz TELEGRAM_SESSION")
+            return False
+
+        # Sauvegarder la session (inutile si déjà connue)
         session = client.session.save()
-        if session:
-            logger.info(f"🔑 Session: {session[:50]}...")
-            logger.info("💡 Sauvegardez cette session dans TELEGRAM_SESSION pour les redémarrages")
+        if session and session != session_string:
+            save_session(session)
+
+        # Entités connues: pas de résolution réseau au redémarrage
+        cached_entities = len(entity_cache)
+        if cached_entities:
+            logger.info(f"📇 {cached_entities} entités chargées depuis le cache")
 
         # Vérifier les canaux
         logger.info("🔍 Vérification des canaux...")
 
-        try:
-            source = await client.get_entity(SOURCE_CHANNEL_ID)
+        cached_source = entity_cache.get(str(SOURCE_CHANNEL_ID))
+        if cached_source:
             source_channel_ok = True
-            logger.info(f"✅ Canal source: {getattr(source, 'title', 'N/A')}")
-        except Exception as e:
-            logger.error(f"❌ Canal source inaccessible: {e}")
+            logger.info(f"✅ Canal source (cache): {cached_source.get('title', 'N/A')}")
+        else:
+            try:
+                source = await resolve_entity(SOURCE_CHANNEL_ID)
+                source_channel_ok = True
+                remember_entity(SOURCE_CHANNEL_ID, source)
+                logger.info(f"✅ Canal source: {getattr(source, 'title', 'N/A')}")
+            except Exception as e:
+                logger.error(f"❌ Canal source inaccessible: {e}")
 
-        try:
-            pred = await client.get_entity(PREDICTION_CHANNEL_ID)
-            # Test d'écriture
-            test = await client.send_message(PREDICTION_CHANNEL_ID, "🤖 Bot v2.0 démarré!")
-            await client.delete_messages(PREDICTION_CHANNEL_ID, test.id)
-            prediction_channel_ok = True
-            logger.info(f"✅ Canal prédiction: {getattr(pred, 'title', 'N/A')}")
-        except Exception as e:
-            logger.error(f"❌ Canal prédiction inaccessible: {e}")
+        for destination, ok, detail in await check_all_prediction_destinations(test_text="🤖 Bot v2.0 démarré!"):
+            if ok:
+                logger.info(f"✅ Canal prédiction {destination}: {detail}")
+            else:
+                logger.error(f"❌ Canal prédiction {destination} inaccessible: {detail}")
+
+        startup_seconds = time.perf_counter() - started_at
+        logger.info(f"⏱️ Prêt en {startup_seconds:.2f}s (session {'réutilisée' if had_session else 'nouvelle'}, {cached_entities} entités en cache)")
 
         logger.info(f"📋 Règle active: 2 cartes identiques dans G2 → Prédiction N+{PREDICTION_OFFSET}")
         return True
@@ -665,6 +1483,8 @@ async def start_bot():
 
 async def main():
     """Fonction principale"""
+    global digest_wakeup, ingest_queue, ingest_task
+
     try:
         # Démarrer le serveur web d'abord (Render.com requirement)
         await start_web_server()
@@ -675,12 +1495,22 @@ async def main():
             logger.error("Arrêt du programme")
             return
 
+        # Résumé de transfert en arrière-plan (hors du chemin de vérification)
+        digest_wakeup = asyncio.Event()
+        digest_task = asyncio.create_task(transfer_digest_loop())
+
+        # Ingestion HTTP seulement une fois les destinations vérifiées
+        ingest_queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+        ingest_task = asyncio.create_task(ingest_worker())
+
         logger.info("✅ Bot complètement opérationnel!")
         await client.run_until_disconnected()
 
     except Exception as e:
         logger.error(f"❌ Erreur fatale: {e}")
     finally:
+        if transfer_mode == 'digest':
+            await flush_transfer_digest(force=True)
         await client.disconnect()
 
 if __name__ == '__main__':